@@ -1,7 +1,21 @@
 import socket
+import time
+
+DNS_CACHE_TTL = 15 * 60  # seconds
+_dns_cache = {}  # host -> (ip, monotonic expiry)
+
+def _resolve(host):
+    """Resolve host to an IPv4 address, caching the answer for DNS_CACHE_TTL seconds."""
+    now = time.monotonic()
+    cached = _dns_cache.get(host)
+    if cached and cached[1] > now:
+        return cached[0]
+    ip = socket.gethostbyname(host)
+    _dns_cache[host] = (ip, now + DNS_CACHE_TTL)
+    return ip
 
 def get_ip_address(domain_name):
-    return socket.gethostbyname(domain_name)
+    return _resolve(domain_name)
 
 domain_name = "willyramos.com"
 ip_address = get_ip_address(domain_name)
@@ -1,12 +1,28 @@
 
-import socket
+import asyncio
 
-def scan_port(host, port, timeout=1.0):
+async def scan_port(host, port, timeout=1.0):
     """Try to connect to a single port. Return True if open, False if closed."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.settimeout(timeout)
-        result = s.connect_ex((host, port))  # 0 means success
-        return result == 0
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (asyncio.TimeoutError, OSError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+async def scan_ports(host, ports, timeout=1.0, max_workers=100):
+    """Scan all ports concurrently. Returns a list of True/False in the same order as ports."""
+    sem = asyncio.Semaphore(max_workers)
+
+    async def bounded_scan(port):
+        async with sem:
+            return await scan_port(host, port, timeout)
+
+    return await asyncio.gather(*(bounded_scan(p) for p in ports))
 
 def mini_port_scanner():
     """Ask the user for a host and some ports, then scan them."""
@@ -22,8 +38,8 @@ def mini_port_scanner():
     print(f"\nScanning {host} ...\n")
     open_ports = []
 
-    for port in ports:
-        is_open = scan_port(host, port)
+    results = asyncio.run(scan_ports(host, ports))
+    for port, is_open in zip(ports, results):
         if is_open:
             print(f"✅ Port {port} is OPEN")
             open_ports.append(port)
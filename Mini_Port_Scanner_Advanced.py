@@ -2,30 +2,46 @@
 """
 Mini Port Scanner (Presets + CSV/JSON export)
 - Preset port ranges (well-known, web, common services) or custom lists/ranges
-- Threads for speed
+- asyncio non-blocking connects for speed
 - Pretty console summary + file log
 - Optional CSV and/or JSON export of results
 """
 
 import socket
-import concurrent.futures
+import asyncio
+import threading
 import time
 from datetime import datetime
-import logging
 import sys
-import json
-import csv
+import io
+import struct
+import itertools
+import re
+from array import array
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
 
 LOG_FILE = "port_scan_log.txt"
 
 # ---------- logging setup ----------
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(message)s",
-    datefmt="%d-%m-%Y %H:%M:%S",
-)
-logger = logging.getLogger("port_scanner")
+# Configured on first use so runs that never log don't pay for it at startup
+_logger = None
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        import logging
+        logging.basicConfig(
+            filename=LOG_FILE,
+            level=logging.INFO,
+            format="%(asctime)s %(levelname)s %(message)s",
+            datefmt="%d-%m-%Y %H:%M:%S",
+        )
+        _logger = logging.getLogger("port_scanner")
+    return _logger
 # -----------------------------------
 
 # Small, practical “common services” preset
@@ -37,99 +53,279 @@ COMMON_SERVICES = [
 ]
 WEB_PRESET = [80, 443, 8000, 8080, 8081, 8088, 8443, 8888]
 
+# Presets are constant, so build their sorted port tuples once at import
+_WELL_KNOWN = tuple(range(1, 1025))
+_WEB_SORTED = tuple(sorted(set(WEB_PRESET)))
+_COMMON_SORTED = tuple(sorted(set(COMMON_SERVICES)))
+
+# Per-port status codes stored in the results bitmap (0 = not scanned)
+STATUS_CODES = {"open": 1, "closed": 2, "filtered": 3}
+PORT_SPACE = 65536
+
+# Port list tokens are split on whitespace/commas, then matched as "N" or "N-M".
+# Only ASCII digits are accepted: "+80", "1_0" and non-ASCII digits such as "٨٠"
+# (all of which int() would take) are rejected, as are the same forms inside ranges.
+_PORT_SPLIT_RE = re.compile(r"[^\s,]+")
+_PORT_TOKEN_RE = re.compile(r"([0-9]+)(?:-([0-9]+))?")
+# Per-port lines are buffered and written to the console every N results
+OUTPUT_FLUSH_EVERY = 256
+
+# Resolved hosts are cached in-process so repeat scans skip the resolver
+DNS_CACHE_TTL = 15 * 60  # seconds
+_dns_cache = {}  # host -> (ip, monotonic expiry)
+
+def _numeric_host(host: str):
+    """Return the address if host is already an IP literal (no DNS needed), else None."""
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return host
+        except (OSError, ValueError):
+            pass
+    # shorthand numeric forms such as "127.1" that inet_pton rejects
+    try:
+        return socket.getaddrinfo(host, None, socket.AF_INET, flags=socket.AI_NUMERICHOST)[0][4][0]
+    except (socket.gaierror, ValueError):
+        return None
+
+def _resolve(host: str) -> str:
+    """
+    Resolve host to an IP address. IP literals are passed straight through;
+    names are looked up and cached for DNS_CACHE_TTL seconds.
+    """
+    ip = _numeric_host(host)
+    if ip:
+        return ip
+    now = time.monotonic()
+    cached = _dns_cache.get(host)
+    if cached and cached[1] > now:
+        return cached[0]
+    ip = socket.gethostbyname(host)
+    _dns_cache[host] = (ip, now + DNS_CACHE_TTL)
+    return ip
+
+def resolve_in_background(host: str) -> dict:
+    """
+    Start resolving host on a daemon thread. The returned dict gets "ip" or
+    "error" filled in, then its "done" event is set; being a daemon thread,
+    it never holds up an early exit while a slow lookup is still running.
+    """
+    resolving = {"done": threading.Event(), "ip": None, "error": None}
+
+    def run():
+        try:
+            resolving["ip"] = _resolve(host)
+        except Exception as e:
+            resolving["error"] = e
+        finally:
+            resolving["done"].set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return resolving
+
+def _resolve_failed(host: str, resolving: dict) -> bool:
+    """Report and return True if the background lookup has already failed."""
+    if resolving["done"].is_set() and resolving["error"] is not None:
+        print(f"Failed to resolve host '{host}': {resolving['error']}")
+        return True
+    return False
+
+# SO_LINGER on with a 0s timeout: close() sends RST, so no TIME_WAIT is left behind
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
+def available_ephemeral_ports() -> int:
+    """Size of the local ephemeral port range (Linux default when it can't be read)."""
+    try:
+        with open("/proc/sys/net/ipv4/ip_local_port_range", encoding="utf-8") as f:
+            low, high = map(int, f.read().split())
+        return high - low + 1
+    except (OSError, ValueError):
+        return 28232
+
+def _new_scan_socket(family: int = socket.AF_INET) -> socket.socket:
+    """Non-blocking TCP socket set up so that many parallel connects don't exhaust local ports."""
+    s = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        s.setblocking(False)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if sys.platform.startswith("linux"):
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+    except OSError:
+        s.close()
+        raise
+    return s
+
+def _raise_fd_limit(needed: int):
+    """Raise the soft open-file limit so `needed` sockets can be in flight (no-op on Windows)."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY or soft >= needed:
+        return
+    target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ValueError, OSError):
+        pass
+
+def _flush_output(buf: io.StringIO):
+    """Write buffered result lines to the console in one go and reset the buffer."""
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+    buf.seek(0)
+    buf.truncate()
+
 def parse_ports(port_input: str):
     """
     Accepts strings containing ports and ranges and returns a sorted unique list of ints.
     Supports "22 80 443", "21,22,23", "20-25" or any combination.
     """
-    tokens = port_input.replace(",", " ").split()
     ports = set()
-    for token in tokens:
-        if "-" in token:
-            try:
-                start, end = token.split("-", 1)
-                start, end = int(start), int(end)
-                if start > end:
-                    start, end = end, start
-                if start < 1 or end > 65535:
-                    raise ValueError
-                ports.update(range(start, end + 1))
-            except ValueError:
-                raise ValueError(f"Invalid range token: '{token}'")
-        else:
-            try:
-                p = int(token)
-                if p < 1 or p > 65535:
-                    raise ValueError
-                ports.add(p)
-            except ValueError:
-                raise ValueError(f"Invalid port token: '{token}'")
+    for token in _PORT_SPLIT_RE.findall(port_input):
+        m = _PORT_TOKEN_RE.fullmatch(token)
+        if m is None:
+            kind = "range" if "-" in token else "port"
+            raise ValueError(f"Invalid {kind} token: '{token}'")
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else start
+        if start > end:
+            start, end = end, start
+        if start < 1 or end > 65535:
+            kind = "range" if m.group(2) else "port"
+            raise ValueError(f"Invalid {kind} token: '{token}'")
+        ports.update(range(start, end + 1))
     return sorted(ports)
 
-def scan_port(host: str, port: int, timeout: float = 1.0) -> tuple:
+async def _connect_within(loop, s: socket.socket, address: tuple, timeout: float):
+    """loop.sock_connect with a deadline; on Python 3.11+ this avoids wait_for's extra task per port."""
+    if hasattr(asyncio, "timeout"):
+        async with asyncio.timeout(timeout):
+            await loop.sock_connect(s, address)
+    else:
+        await asyncio.wait_for(loop.sock_connect(s, address), timeout)
+
+async def scan_port(host: str, port: int, timeout: float = 1.0) -> tuple:
     """
-    Attempt to connect to host:port.
-    Returns (port, is_open:bool, err:str|None, elapsed_seconds:float)
+    Attempt a non-blocking TCP connect to host:port.
+    Returns (port, status:str, err:str|None, elapsed_ns:int)
+    where status is "open", "closed" (refused) or "filtered" (timeout/other error).
     """
-    start = time.time()
+    loop = asyncio.get_running_loop()
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    start = time.perf_counter_ns()
+    s = None
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(timeout)
-            code = s.connect_ex((host, port))  # 0 == success
-            elapsed = time.time() - start
-            if code == 0:
-                return (port, True, None, elapsed)
-            else:
-                return (port, False, None, elapsed)
+        s = _new_scan_socket(family)
+        await _connect_within(loop, s, (host, port), timeout)
+    except ConnectionRefusedError:
+        return (port, "closed", None, time.perf_counter_ns() - start)
+    except (asyncio.TimeoutError, OSError) as e:
+        return (port, "filtered", str(e) or "timed out", time.perf_counter_ns() - start)
     except Exception as e:
-        elapsed = time.time() - start
-        return (port, False, str(e), elapsed)
+        return (port, "filtered", str(e), time.perf_counter_ns() - start)
+    finally:
+        if s is not None:
+            s.close()
+    return (port, "open", None, time.perf_counter_ns() - start)
+
+async def _scan_ports_async(host: str, ports, timeout: float, max_workers: int):
+    """
+    Run max_workers worker tasks that pull ports from one shared iterator,
+    so the number of tasks and sockets in flight never exceeds max_workers.
+    """
+    # Indexed by port number, so results come out sorted without a sort pass
+    status_map = bytearray(PORT_SPACE)
+    elapsed_map = array("Q", bytes(8 * PORT_SPACE))
+    errors = {}  # sparse: only ports that reported an error
+    buf = io.StringIO()
+    done = 0
+    pending = iter(ports)
+
+    async def worker():
+        nonlocal done
+        for p in pending:  # each port is taken by exactly one worker
+            port, status, err, elapsed_ns = await scan_port(host, p, timeout)
+            label = "[OPEN]" if status == "open" else f"[{status}]"
+            print(f"{label:<10} {port} (took {elapsed_ns / 1e9:.3f}s)", file=buf)
+            status_map[port] = STATUS_CODES[status]
+            elapsed_map[port] = elapsed_ns
+            if err:
+                errors[port] = err
+            done += 1
+            if done % OUTPUT_FLUSH_EVERY == 0:
+                _flush_output(buf)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(max_workers, len(ports)))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        _flush_output(buf)
+    return {"status": status_map, "elapsed": elapsed_map, "errors": errors}
 
 def scan_ports_concurrent(host: str, ports, timeout=1.0, max_workers=100):
     """
-    Scan ports using a thread pool.
-    Returns dict with keys: open (list of dicts), closed (list of dicts)
+    Scan ports using asyncio non-blocking connects on a single thread.
+    max_workers caps the number of concurrent connects.
+    Returns dict with keys: status (bytearray of STATUS_CODES indexed by port),
+    elapsed (array of nanoseconds indexed by port), errors (dict port -> message)
     """
-    results_open = []
-    results_closed = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(scan_port, host, p, timeout): p for p in ports}
-        try:
-            for fut in concurrent.futures.as_completed(futures):
-                p = futures[fut]
-                try:
-                    port, is_open, err, elapsed = fut.result()
-                    if is_open:
-                        print(f"[OPEN]   {port} (took {elapsed:.3f}s)")
-                        results_open.append({"port": port, "elapsed": elapsed})
-                    else:
-                        print(f"[closed] {port} (took {elapsed:.3f}s)")
-                        results_closed.append({"port": port, "error": err, "elapsed": elapsed})
-                except Exception as exc:
-                    print(f"[error]  {p} -> {exc}")
-                    results_closed.append({"port": p, "error": str(exc), "elapsed": 0.0})
-        except KeyboardInterrupt:
-            print("\nScan interrupted by user. Shutting down threads...")
-            executor.shutdown(wait=False, cancel_futures=True)
-            raise
-    return {"open": results_open, "closed": results_closed}
-
-def log_scan(host: str, ports, open_ports, elapsed_total):
-    logger.info(f"Scan of {host} | ports: {len(ports)} | open: {len(open_ports)} | duration: {elapsed_total:.3f}s")
-    if open_ports:
+    # one fd per in-flight socket, plus headroom for the event loop and log/export files
+    _raise_fd_limit(max_workers * 2)
+    try:
+        return asyncio.run(_scan_ports_async(host, ports, timeout, max_workers))
+    except KeyboardInterrupt:
+        print("\nScan interrupted by user. Cancelling pending connects...")
+        raise
+
+def count_results(results: dict, status: str) -> int:
+    return results["status"].count(STATUS_CODES[status])
+
+def iter_results(results: dict, status: str):
+    """Yield (port, elapsed_ns, error) for every port with the given status, in port order."""
+    code = STATUS_CODES[status]
+    status_map, elapsed_map, errors = results["status"], results["elapsed"], results["errors"]
+    port = status_map.find(code)
+    while port != -1:
+        yield port, elapsed_map[port], errors.get(port)
+        port = status_map.find(code, port + 1)
+
+def log_scan(host: str, ports, results, elapsed_total):
+    logger = _get_logger()
+    open_count = count_results(results, "open")
+    logger.info(f"Scan of {host} | ports: {len(ports)} | open: {open_count} | duration: {elapsed_total:.3f}s")
+    if open_count:
         logger.info("Open ports:")
-        for item in sorted(open_ports, key=lambda x: x["port"]):
-            logger.info(f" - {item['port']} (response {item['elapsed']:.3f}s)")
+        for port, elapsed_ns, _ in iter_results(results, "open"):
+            logger.info(f" - {port} (response {elapsed_ns / 1e9:.3f}s)")
     logger.info("-" * 60)
 
+def _json_records(results: dict, status: str):
+    for port, elapsed_ns, err in iter_results(results, status):
+        if status == "open":
+            yield {"port": port, "elapsed": elapsed_ns / 1e9}
+        else:
+            yield {"port": port, "error": err, "elapsed": elapsed_ns / 1e9}
+
 def export_json(filename: str, metadata: dict, results: dict):
-    data = {
-        "metadata": metadata,
-        "open": results["open"],
-        "closed": results["closed"],
-    }
+    """
+    Streams the JSON document one record per line, so memory stays flat
+    however many ports were scanned.
+    """
+    import json
+
     with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+        f.write('{\n"metadata": ')
+        json.dump(metadata, f)
+        for status in STATUS_CODES:
+            f.write(f',\n"{status}": [')
+            sep = "\n  "
+            for record in _json_records(results, status):
+                f.write(sep)
+                f.write(json.dumps(record))
+                sep = ",\n  "
+            f.write("\n]")
+        f.write("\n}\n")
     print(f"✅ JSON saved as {filename}")
 
 def export_csv(filename: str, metadata: dict, results: dict):
@@ -138,6 +334,8 @@ def export_csv(filename: str, metadata: dict, results: dict):
     - A small metadata header (#-prefixed comment rows)
     - A table of results with columns: status, port, elapsed, error
     """
+    import csv
+
     with open(filename, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         # metadata as commented rows
@@ -151,10 +349,12 @@ def export_csv(filename: str, metadata: dict, results: dict):
 
         # header
         writer.writerow(["status", "port", "elapsed_seconds", "error"])
-        for item in sorted(results["open"], key=lambda x: x["port"]):
-            writer.writerow(["open", item["port"], f"{item['elapsed']:.3f}", ""])
-        for item in sorted(results["closed"], key=lambda x: x["port"]):
-            writer.writerow(["closed", item["port"], f"{item['elapsed']:.3f}", item.get("error") or ""])
+        # rows come out of the bitmap already in port order; writerows consumes them lazily
+        writer.writerows(itertools.chain.from_iterable(
+            ((status, port, f"{elapsed_ns / 1e9:.3f}", err or "")
+             for port, elapsed_ns, err in iter_results(results, status))
+            for status in STATUS_CODES
+        ))
     print(f"✅ CSV saved as {filename}")
 
 def choose_preset_or_custom():
@@ -165,11 +365,11 @@ def choose_preset_or_custom():
     print("4) Custom (e.g. '22 80 443' or '1-1024' or '22,80,8000-8005')")
     choice = input("Choose 1–4: ").strip()
     if choice == "1":
-        return list(range(1, 1025))
+        return _WELL_KNOWN
     elif choice == "2":
-        return sorted(set(WEB_PRESET))
+        return _WEB_SORTED
     elif choice == "3":
-        return sorted(set(COMMON_SERVICES))
+        return _COMMON_SORTED
     else:
         port_input = input("Enter ports/ranges: ").strip()
         return parse_ports(port_input)
@@ -181,12 +381,8 @@ def main():
         print("No host provided. Exiting.")
         return
 
-    # Resolve host to ensure valid target
-    try:
-        socket.gethostbyname(host)
-    except Exception as e:
-        print(f"Failed to resolve host '{host}': {e}")
-        return
+    # Resolve while the user answers the remaining prompts; the scan then connects to the IP
+    resolving = resolve_in_background(host)
 
     # Choose ports by preset or custom input
     try:
@@ -194,45 +390,57 @@ def main():
     except ValueError as e:
         print(f"Port input error: {e}")
         return
+    if _resolve_failed(host, resolving):
+        return
 
     try:
         timeout = float(input("Socket timeout in seconds (default 1.0): ").strip() or "1.0")
     except ValueError:
         timeout = 1.0
+    if _resolve_failed(host, resolving):
+        return
 
     try:
-        max_workers = int(input("Max worker threads (default 200): ").strip() or "200")
+        max_workers = int(input("Max concurrent connects (default 200): ").strip() or "200")
         max_workers = max(1, min(1000, max_workers))
     except ValueError:
         max_workers = 200
+    # each in-flight connect holds one local port; leave half the range for everything else
+    max_workers = min(max_workers, available_ephemeral_ports() // 2)
+
+    resolving["done"].wait()
+    if _resolve_failed(host, resolving):
+        return
+    ip = resolving["ip"]
 
     started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"\nScanning {host} on {len(ports)} ports (timeout {timeout}s, workers {max_workers})...\n")
-    t0 = time.time()
+    t0 = time.perf_counter_ns()
     try:
-        results = scan_ports_concurrent(host, ports, timeout=timeout, max_workers=max_workers)
+        results = scan_ports_concurrent(ip, ports, timeout=timeout, max_workers=max_workers)
     except KeyboardInterrupt:
         print("Scan aborted by user.")
         return
-    elapsed = time.time() - t0
+    elapsed = (time.perf_counter_ns() - t0) / 1e9
 
-    open_ports = results["open"]
+    open_count = count_results(results, "open")
 
     # Summary
     print("\n--- Scan complete ---")
     print(f"Host: {host}")
     print(f"Scanned ports: {len(ports)}")
-    print(f"Open ports: {len(open_ports)}")
-    if open_ports:
+    print(f"Open ports: {open_count}")
+    print(f"Filtered ports: {count_results(results, 'filtered')}")
+    if open_count:
         print("Open ports (port : response_time):")
-        for item in sorted(open_ports, key=lambda x: x["port"]):
-            print(f"  {item['port']} : {item['elapsed']:.3f}s")
+        for port, elapsed_ns, _ in iter_results(results, "open"):
+            print(f"  {port} : {elapsed_ns / 1e9:.3f}s")
     else:
         print("No open ports found.")
     print(f"Total time: {elapsed:.3f}s")
 
     # Log summary
-    log_scan(host, ports, open_ports, elapsed)
+    log_scan(host, ports, results, elapsed)
     print(f"Summary appended to '{LOG_FILE}'")
 
     # Export options
@@ -1,23 +1,22 @@
 import socket
+from concurrent.futures import ThreadPoolExecutor
 
 def is_up(addr, port, family):
-    s = socket.socket(family, socket.SOCK_STREAM)
-    s.settimeout(1)
-    if s.connect_ex((addr, port)) == 0:
-        return True
-    else:
-        return False
+    with socket.socket(family, socket.SOCK_STREAM) as s:
+        s.settimeout(1)
+        return s.connect_ex((addr, port)) == 0
 
 ipv4_range = "192.168.0."
 ipv6_range = "2001:0db8:85a3:0000:0000:8a2e:0370:7334"
-for i in range(1, 16):
-    addr = ipv4_range + str(i)
-    if is_up(addr, 135, socket.AF_INET):
+targets = [(ipv4_range + str(i), socket.AF_INET) for i in range(1, 16)]
+targets.append((ipv6_range, socket.AF_INET6))
+
+# Probe every address at once so down hosts don't each cost a full timeout in turn
+with ThreadPoolExecutor(max_workers=32) as ex:
+    results = list(ex.map(lambda t: (t[0], is_up(t[0], 135, t[1])), targets))
+
+for addr, up in results:
+    if up:
         print(addr, "is up")
     else:
         print(addr, "is down")
-
-if is_up(ipv6_range, 135, socket.AF_INET6):
-    print(ipv6_range, "is up")
-else:
-    print(ipv6_range, "is down")
@@ -1,7 +1,30 @@
 import subprocess
+import io
+import sys
 import ipaddress
 import concurrent.futures
+import itertools
 import time
+import os
+import select
+import socket
+import struct
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# Per-host/per-port lines are buffered and written to the console every N results
+OUTPUT_FLUSH_EVERY = 256
+
+
+def _flush_output(buf):
+
+    #Write buffered result lines to the console in one go and reset the buffer.
+
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+    buf.seek(0)
+    buf.truncate()
 
 
 def ping_ip(ip):
@@ -17,7 +40,173 @@ def ping_ip(ip):
         return result.returncode == 0
     except Exception:
         return False
-    
+
+
+def host_range(network):
+
+    #Usable host addresses of network as a range of ints, without building an address object per host.
+
+    first = int(network.network_address)
+    total = network.num_addresses
+    if total <= 2:  # /31, /32 (and /127, /128): every address is a host
+        return range(first, first + total)
+    if network.version == 4:
+        return range(first + 1, first + total - 1)  # skip network and broadcast
+    return range(first + 1, first + total)  # IPv6 has no broadcast
+
+
+def iter_host_ips(network):
+
+    #Yield usable host IPs as strings, formatting each one only when it is needed.
+
+    if network.version == 4:
+        pack = struct.Struct("!I").pack
+        for n in host_range(network):
+            yield socket.inet_ntoa(pack(n))
+    else:
+        for n in host_range(network):
+            yield socket.inet_ntop(socket.AF_INET6, n.to_bytes(16, "big"))
+
+
+def _icmp_checksum(data):
+
+    #Internet checksum (RFC 1071) of an ICMP header + payload.
+
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _icmp_echo_packet(ident, seq):
+
+    #Build an ICMP echo request; seq identifies the target host.
+
+    payload = b"netscan"
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _icmp_checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def _collect_replies(sock, ident, hosts, alive, wait):
+
+    #Read every echo reply that arrives within `wait` seconds into alive.
+    #hosts is the swept host_range; a reply's seq must match its source's index in it.
+
+    deadline = time.monotonic() + wait
+    while True:
+        remaining = deadline - time.monotonic()
+        readable, _, _ = select.select([sock], [], [], max(0.0, remaining))
+        if not readable:
+            return
+        packet, addr = sock.recvfrom(1024)
+        # raw sockets (and DGRAM ones on macOS) hand us the IPv4 header too
+        ihl = (packet[0] & 0x0F) * 4 if packet[0] >> 4 == 4 else 0
+        icmp_type, _, _, reply_id, seq = struct.unpack("!BBHHH", packet[ihl:ihl + 8])
+        ip = addr[0]
+        index = int.from_bytes(socket.inet_aton(ip), "big") - hosts.start
+        if (icmp_type == ICMP_ECHO_REPLY and (ident is None or reply_id == ident)
+                and 0 <= index < len(hosts) and index & 0xFFFF == seq):
+            alive.add(ip)
+
+
+def _open_icmp_socket():
+
+    #Open an ICMP socket: raw if allowed, else an unprivileged "ping socket" (Linux/macOS).
+    #Returns (sock, raw). Raises PermissionError when neither is permitted.
+
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), True
+    except PermissionError:
+        pass
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), False
+    except OSError as e:
+        raise PermissionError(f"no raw or unprivileged ICMP sockets available: {e}") from e
+
+
+def icmp_sweep(network, timeout=1.0):
+
+    #Send one ICMP echo to every host of an IPv4 network over a single ICMP socket and return the set of IPs that replied.
+    #Raises PermissionError when no ICMP socket can be opened.
+
+    ident = os.getpid() & 0xFFFF
+    hosts = host_range(network)  # seq is the host's index, so replies map back without a lookup table
+    alive = set()
+    sock, raw = _open_icmp_socket()
+    if not raw:
+        ident = None  # the kernel rewrites the identifier on ping sockets and filters replies itself
+    with sock:
+        for index, ip in enumerate(iter_host_ips(network)):
+            try:
+                sock.sendto(_icmp_echo_packet(ident or 0, index & 0xFFFF), (ip, 0))
+            except OSError:
+                continue  # e.g. broadcast or unreachable address
+            _collect_replies(sock, ident, hosts, alive, 0)  # drain so replies aren't dropped
+        _collect_replies(sock, ident, hosts, alive, timeout)
+    return alive
+
+
+def ask_max_workers():
+
+    #Prompt for the ping sweep's worker thread count, clamped between 1 and 500.
+
+    try:
+        max_workers = int(input("Max worker threads (default 100): ").strip() or "100")
+        return max(1, min(500, max_workers))
+    except ValueError:
+        return 100
+
+
+def threaded_ping_sweep(hosts, total, max_workers):
+
+    #Fallback sweep: one ping process per host on a thread pool. Returns list of active IPs.
+
+    active_hosts = []
+    buf = io.StringIO()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # keep a bounded number of pings queued instead of one future per host up front
+        hosts = iter(hosts)
+        future_to_ip = {}
+
+        def submit_more():
+            for ip in itertools.islice(hosts, max_workers * 4 - len(future_to_ip)):
+                future_to_ip[executor.submit(ping_ip, ip)] = ip
+
+        try:
+            submit_more()
+            i = 0
+            while future_to_ip:
+                done, _ = concurrent.futures.wait(future_to_ip, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    i += 1
+                    ip = future_to_ip.pop(future)
+                    try:
+                        is_up = future.result()
+                        if is_up:
+                            print(f"🟢 Host up: {ip}", file=buf)
+                            active_hosts.append(ip)
+                        else:
+                            # comment this out if you don’t want to see downs
+                            print(f"🔴 Host down: {ip}", file=buf)
+                    except Exception as e:
+                        print(f"Error checking {ip}: {e}", file=buf)
+
+                    # flush buffered lines with a simple progress indicator
+                    if i % OUTPUT_FLUSH_EVERY == 0 or i == total:
+                        _flush_output(buf)
+                        print(f"Progress: {i}/{total} hosts scanned...", end="\r")
+                submit_more()
+
+        except KeyboardInterrupt:
+            _flush_output(buf)
+            print("\nScan interrupted by user. Stopping...")
+            executor.shutdown(wait=False, cancel_futures=True)
+    return active_hosts
+
+
 def threaded_network_scan():
     print("Threaded Network Scanner (Ping)")
     subnet_input = input("Enter subnet in CIDR format (e.g. 192.168.1.0/24): ").strip()
@@ -28,57 +217,41 @@ def threaded_network_scan():
         print("Invalid subnet format.")
         return
     
-    hosts = list(network.hosts()) # list of IP objects
-    if not hosts:
+    total_hosts = len(host_range(network))
+    if not total_hosts:
         print("No usable hosts in this subnet")
         return
     
     
     print(f"\nScanning {subnet_input} ...\n")
-    print(f"Total hosts to scan: {len(hosts)}")
-
-    try:
-
-
-        max_workers = int(input("Max worker threads (default 100): ").strip() or "100")
-        max_workers = max(1, min(500, max_workers))  # clamp between 1 and 500
-    except ValueError:
-        max_workers = 100
+    print(f"Total hosts to scan: {total_hosts}")
 
     start_time = time.time()
-    active_hosts = []
-
-    # Use a thread pool to ping multiple IPs at once
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_ip = {executor.submit(ping_ip, ip): ip for ip in hosts}
 
+    # One ICMP socket for the whole sweep; fall back to ping processes if none can be opened
+    active_hosts = None
+    if network.version == 4:
         try:
-            for i, future in enumerate(concurrent.futures.as_completed(future_to_ip), start=1):
-                ip = future_to_ip[future]
-                try:
-                    is_up = future.result()
-                    if is_up:
-                        print(f"🟢 Host up: {ip}")
-                        active_hosts.append(str(ip))
-                    else:
-                        # comment this out if you don’t want to see downs
-                        print(f"🔴 Host down: {ip}")
-                except Exception as e:
-                    print(f"Error checking {ip}: {e}")
-
-                # simple progress indicator
-                if i % 10 == 0 or i == len(hosts):
-                    print(f"Progress: {i}/{len(hosts)} hosts scanned...", end="\r")
-
+            alive = icmp_sweep(network)
+            active_hosts = sorted(alive, key=socket.inet_aton)
+            for ip in active_hosts:
+                print(f"🟢 Host up: {ip}")
+        except PermissionError:
+            print("ICMP sockets are not permitted here, falling back to threaded ping.")
         except KeyboardInterrupt:
             print("\nScan interrupted by user. Stopping...")
-            executor.shutdown(wait=False, cancel_futures=True)
+            active_hosts = []
+    if active_hosts is None:
+        # worker threads only matter for the ping sweep, so only ask when it runs
+        max_workers = ask_max_workers()
+        start_time = time.time()  # don't count time spent at the prompt
+        active_hosts = threaded_ping_sweep(iter_host_ips(network), total_hosts, max_workers)
 
     elapsed = time.time() - start_time
 
     print("\n\n--- Scan complete ---")
     print(f"Subnet: {subnet_input}")
-    print(f"Hosts scanned: {len(hosts)}")
+    print(f"Hosts scanned: {total_hosts}")
     print(f"Active hosts found: {len(active_hosts)}")
     if active_hosts:
         print("\nActive hosts:")
@@ -1,14 +1,37 @@
 import subprocess
+import io
+import sys
 import ipaddress
 import concurrent.futures
+import itertools
 import time
+import asyncio
+import os
+import select
 import socket
+import struct
+import queue
+import threading
 from datetime import datetime
 
 LOG_FILE = "network_recon_log.txt"
 
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# Per-host/per-port lines are buffered and written to the console every N results
+OUTPUT_FLUSH_EVERY = 256
+
 # ---------- PING PHASE ----------
 
+def _flush_output(buf):
+    """Write buffered result lines to the console in one go and reset the buffer."""
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+    buf.seek(0)
+    buf.truncate()
+
+
 def ping_ip(ip):
     """Return True if host responds to a ping request (Windows)."""
     try:
@@ -22,48 +45,201 @@ def ping_ip(ip):
         return False
 
 
-def discover_active_hosts(subnet_input, max_workers=100):
-    """Threaded ping sweep. Returns list of active IPs as strings."""
+def host_range(network):
+    """Usable host addresses of network as a range of ints, without building an address object per host."""
+    first = int(network.network_address)
+    total = network.num_addresses
+    if total <= 2:  # /31, /32 (and /127, /128): every address is a host
+        return range(first, first + total)
+    if network.version == 4:
+        return range(first + 1, first + total - 1)  # skip network and broadcast
+    return range(first + 1, first + total)  # IPv6 has no broadcast
+
+
+def iter_host_ips(network):
+    """Yield usable host IPs as strings, formatting each one only when it is needed."""
+    if network.version == 4:
+        pack = struct.Struct("!I").pack
+        for n in host_range(network):
+            yield socket.inet_ntoa(pack(n))
+    else:
+        for n in host_range(network):
+            yield socket.inet_ntop(socket.AF_INET6, n.to_bytes(16, "big"))
+
+
+def _icmp_checksum(data):
+    """Internet checksum (RFC 1071) of an ICMP header + payload."""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _icmp_echo_packet(ident, seq):
+    """Build an ICMP echo request; seq identifies the target host."""
+    payload = b"netscan"
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _icmp_checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def _collect_replies(sock, ident, hosts, alive, wait, on_reply=None):
+    """
+    Read every echo reply that arrives within `wait` seconds into alive.
+    hosts is the swept host_range; a reply's seq must match its source's index in it.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        remaining = deadline - time.monotonic()
+        readable, _, _ = select.select([sock], [], [], max(0.0, remaining))
+        if not readable:
+            return
+        packet, addr = sock.recvfrom(1024)
+        # raw sockets (and DGRAM ones on macOS) hand us the IPv4 header too
+        ihl = (packet[0] & 0x0F) * 4 if packet[0] >> 4 == 4 else 0
+        icmp_type, _, _, reply_id, seq = struct.unpack("!BBHHH", packet[ihl:ihl + 8])
+        ip = addr[0]
+        index = int.from_bytes(socket.inet_aton(ip), "big") - hosts.start
+        if (icmp_type == ICMP_ECHO_REPLY and (ident is None or reply_id == ident)
+                and 0 <= index < len(hosts) and index & 0xFFFF == seq and ip not in alive):
+            alive.add(ip)
+            if on_reply:
+                on_reply(ip)
+
+
+def _open_icmp_socket():
+    """
+    Open an ICMP socket: raw if allowed, else an unprivileged "ping socket" (Linux/macOS).
+    Returns (sock, raw). Raises PermissionError when neither is permitted.
+    """
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), True
+    except PermissionError:
+        pass
+    try:
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), False
+    except OSError as e:
+        raise PermissionError(f"no raw or unprivileged ICMP sockets available: {e}") from e
+
+
+def icmp_sweep(network, timeout=1.0, on_reply=None):
+    """
+    Send one ICMP echo to every host of an IPv4 network over a single ICMP socket.
+    Returns the set of IP strings that replied within timeout; on_reply(ip) is
+    called as each reply arrives.
+    Raises PermissionError when no ICMP socket can be opened.
+    """
+    ident = os.getpid() & 0xFFFF
+    hosts = host_range(network)  # seq is the host's index, so replies map back without a lookup table
+    alive = set()
+    sock, raw = _open_icmp_socket()
+    if not raw:
+        ident = None  # the kernel rewrites the identifier on ping sockets and filters replies itself
+    with sock:
+        for index, ip in enumerate(iter_host_ips(network)):
+            try:
+                sock.sendto(_icmp_echo_packet(ident or 0, index & 0xFFFF), (ip, 0))
+            except OSError:
+                continue  # e.g. broadcast or unreachable address
+            _collect_replies(sock, ident, hosts, alive, 0, on_reply)  # drain so replies aren't dropped
+        _collect_replies(sock, ident, hosts, alive, timeout, on_reply)
+    return alive
+
+
+def threaded_ping_sweep(hosts, total, max_workers=100, on_up=None):
+    """
+    Fallback sweep: one ping process per host on a thread pool. Returns list of active IPs;
+    on_up(ip) is called as each host answers.
+    """
+    active_hosts = []
+    buf = io.StringIO()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # keep a bounded number of pings queued instead of one future per host up front
+        hosts = iter(hosts)
+        future_to_ip = {}
+
+        def submit_more():
+            for ip in itertools.islice(hosts, max_workers * 4 - len(future_to_ip)):
+                future_to_ip[executor.submit(ping_ip, ip)] = ip
+
+        try:
+            submit_more()
+            i = 0
+            while future_to_ip:
+                done, _ = concurrent.futures.wait(future_to_ip, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    i += 1
+                    ip = future_to_ip.pop(future)
+                    try:
+                        is_up = future.result()
+                        if is_up:
+                            print(f"🟢 Host up:   {ip}", file=buf)
+                            active_hosts.append(ip)
+                            if on_up:
+                                _flush_output(buf)  # report the host before anything acts on it
+                                on_up(ip)
+                        else:
+                            # comment this out if you don't want to see downs
+                            print(f"🔴 Host down: {ip}", file=buf)
+                    except Exception as e:
+                        print(f"Error checking {ip}: {e}", file=buf)
+
+                    # flush buffered lines with a simple progress indicator
+                    if i % OUTPUT_FLUSH_EVERY == 0 or i == total:
+                        _flush_output(buf)
+                        print(f"Progress: {i}/{total} hosts scanned...", end="\r")
+                submit_more()
+        except KeyboardInterrupt:
+            _flush_output(buf)
+            print("\nPing sweep interrupted by user.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            return []
+    return active_hosts
+
+
+def discover_active_hosts(subnet_input, max_workers=100, found=None):
+    """
+    Ping sweep (raw ICMP, or threaded ping as fallback). Returns list of active IPs as strings.
+    If found (a queue.Queue) is given, each live IP is put on it as soon as it answers.
+    """
+    on_up = found.put if found is not None else None
+
+    def host_up(ip):
+        print(f"🟢 Host up:   {ip}")
+        if on_up:
+            on_up(ip)
+
     try:
         network = ipaddress.ip_network(subnet_input, strict=False)
     except ValueError:
         print("Invalid subnet format.")
         return []
 
-    hosts = list(network.hosts())
-    if not hosts:
+    total_hosts = len(host_range(network))
+    if not total_hosts:
         print("No usable hosts in this subnet.")
         return []
 
     print(f"\n[+] Scanning subnet {subnet_input} for live hosts ...")
-    print(f"    Total hosts to scan: {len(hosts)}")
+    print(f"    Total hosts to scan: {total_hosts}")
 
-    active_hosts = []
     start = time.time()
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_ip = {executor.submit(ping_ip, ip): ip for ip in hosts}
-
+    # One ICMP socket for the whole sweep; fall back to ping processes if none can be opened
+    active_hosts = None
+    if network.version == 4:
         try:
-            for i, future in enumerate(concurrent.futures.as_completed(future_to_ip), start=1):
-                ip = future_to_ip[future]
-                try:
-                    is_up = future.result()
-                    if is_up:
-                        print(f"🟢 Host up:   {ip}")
-                        active_hosts.append(str(ip))
-                    else:
-                        # comment this out if you don't want to see downs
-                        print(f"🔴 Host down: {ip}")
-                except Exception as e:
-                    print(f"Error checking {ip}: {e}")
-
-                # simple progress indicator
-                if i % 10 == 0 or i == len(hosts):
-                    print(f"Progress: {i}/{len(hosts)} hosts scanned...", end="\r")
+            alive = icmp_sweep(network, on_reply=host_up)
+            active_hosts = sorted(alive, key=socket.inet_aton)
+        except PermissionError:
+            print("    ICMP sockets are not permitted here, falling back to threaded ping.")
         except KeyboardInterrupt:
             print("\nPing sweep interrupted by user.")
             return []
+    if active_hosts is None:
+        active_hosts = threaded_ping_sweep(iter_host_ips(network), total_hosts, max_workers=max_workers, on_up=on_up)
 
     elapsed = time.time() - start
     print("\n\n[+] Host discovery complete.")
@@ -74,15 +250,47 @@ def discover_active_hosts(subnet_input, max_workers=100):
 
 # ---------- PORT SCAN PHASE ----------
 
-def scan_port(host, port, timeout=1.0):
+async def scan_port(host, port, timeout=1.0):
     """Return True if TCP port is open on host, else False."""
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(timeout)
-            result = s.connect_ex((host, port))  # 0 = open
-            return result == 0
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
     except Exception:
         return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def scan_ports_async(host, ports, timeout=1.0, max_workers=200):
+    """Scan all ports on host concurrently. Returns a list of bools in ports order."""
+    sem = asyncio.Semaphore(max_workers)
+
+    async def bounded_scan(port):
+        async with sem:
+            return await scan_port(host, port, timeout=timeout)
+
+    tasks = [asyncio.create_task(bounded_scan(p)) for p in ports]
+    return await asyncio.gather(*tasks)
+
+
+def resolve_host(host):
+    """
+    Return an IP for host. IP literals are returned as is without touching DNS;
+    anything else is resolved once so the per-port connects don't each look it up.
+    """
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return host
+        except (OSError, ValueError):
+            pass
+    try:
+        return socket.getaddrinfo(host, None, socket.AF_INET, flags=socket.AI_NUMERICHOST)[0][4][0]
+    except socket.gaierror:
+        return socket.gethostbyname(host)
 
 
 def parse_ports_simple(port_input):
@@ -98,21 +306,41 @@ def parse_ports_simple(port_input):
 
 def scan_ports_for_host(host, ports, timeout=1.0):
     """Scan given ports on a single host. Returns list of open ports."""
-    print(f"\n--- Port scan for {host} ---")
+    # the host's whole block is buffered so it isn't split by sweep output from another thread
+    buf = io.StringIO()
+    print(f"\n--- Port scan for {host} ---", file=buf)
     open_ports = []
-    for port in ports:
-        is_open = scan_port(host, port, timeout=timeout)
+    try:
+        target = resolve_host(host)
+    except OSError as e:
+        print(f"  Failed to resolve {host}: {e}", file=buf)
+        _flush_output(buf)
+        return open_ports
+    results = asyncio.run(scan_ports_async(target, ports, timeout=timeout))
+    for port, is_open in zip(ports, results):
         if is_open:
-            print(f"  ✅ Port {port} is OPEN")
+            print(f"  ✅ Port {port} is OPEN", file=buf)
             open_ports.append(port)
         else:
-            print(f"  ❌ Port {port} is closed")
+            print(f"  ❌ Port {port} is closed", file=buf)
     if open_ports:
-        print(f"  Open ports on {host}: {', '.join(str(p) for p in open_ports)}")
+        print(f"  Open ports on {host}: {', '.join(str(p) for p in open_ports)}", file=buf)
     else:
-        print(f"  No open ports found on {host}.")
+        print(f"  No open ports found on {host}.", file=buf)
+    _flush_output(buf)
     return open_ports
 
+def port_scan_worker(found, ports, timeout, results, stop):
+    """
+    Port-scan every host taken from the found queue until a None sentinel arrives
+    or the stop event is set.
+    """
+    while True:
+        host = found.get()
+        if host is None or stop.is_set():
+            return
+        results[host] = scan_ports_for_host(host, ports, timeout=timeout)
+
 # ---------- LOGGING ----------
 
 def log_recon_results(subnet, ports, active_hosts, summary, max_workers, timeout):
@@ -165,17 +393,15 @@ def network_and_port_scanner():
     except ValueError:
         max_workers = 100
 
-    active_hosts = discover_active_hosts(subnet_input, max_workers=max_workers)
-
-    if not active_hosts:
-        print("No active hosts found. Exiting.")
-        return
-        # log empty run as well if you want
-        log_recon_results(subnet_input, [], active_hosts, {}, max_workers, timeout=0.0)
+    # Validate the subnet now rather than after all the port prompts
+    try:
+        ipaddress.ip_network(subnet_input, strict=False)
+    except ValueError:
+        print("Invalid subnet format.")
         return
 
-    # Ask which ports to scan on each active host
-    print("\nNow choose which ports to scan on each active host.")
+    # Ask which ports to scan up front, so each host can be port-scanned as soon as it answers
+    print("\nChoose which ports to scan on each active host.")
     print("Example: 22 80 443 3389")
     port_input = input("Enter ports separated by spaces: ").strip()
 
@@ -190,12 +416,39 @@ def network_and_port_scanner():
     except ValueError:
         timeout = 1.0
 
-    # Port scan each active host
-    print("\n[+] Starting per-host port scans...")
-    summary = {}
-    for host in active_hosts:
-        open_ports = scan_ports_for_host(host, ports, timeout=timeout)
-        summary[host] = open_ports
+    # Port scans run on a consumer thread fed by the ping sweep
+    found = queue.Queue()
+    stop = threading.Event()
+    scan_results = {}
+    scanner = threading.Thread(
+        target=port_scan_worker, args=(found, ports, timeout, scan_results, stop), daemon=True
+    )
+    scanner.start()
+    active_hosts = []
+    try:
+        active_hosts = discover_active_hosts(subnet_input, max_workers=max_workers, found=found)
+    finally:
+        if not active_hosts:
+            # sweep interrupted (or nothing found): don't port-scan hosts that were already queued
+            stop.set()
+        found.put(None)
+
+    try:
+        if active_hosts:
+            print("\n[+] Waiting for per-host port scans to finish...")
+        scanner.join()
+    except KeyboardInterrupt:
+        stop.set()
+        print("\nPort scans interrupted by user. Summarising the hosts scanned so far.")
+
+    if not active_hosts:
+        print("No active hosts found. Exiting.")
+        return
+        # log empty run as well if you want
+        log_recon_results(subnet_input, [], active_hosts, {}, max_workers, timeout=0.0)
+        return
+
+    summary = {host: scan_results[host] for host in active_hosts if host in scan_results}
 
     # Final summary
     print("\n=== Final Summary ===")